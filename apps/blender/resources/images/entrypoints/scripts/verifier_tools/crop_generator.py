@@ -1,13 +1,33 @@
+import logging
 import math
 import random
+from struct import Struct
 from typing import Tuple, Optional, NamedTuple
-import numpy
 
 WORK_DIR = "/golem/work"
 OUTPUT_DIR = "/golem/output"
 CROP_RELATIVE_SIZE = 0.1
 MIN_CROP_SIZE = 8
 
+logger = logging.getLogger(__name__)
+
+_FLOAT32 = Struct('f')
+
+
+def _to_f32(value: float) -> float:
+    """
+    Rounds given value to the nearest single precision float.
+    """
+    return _FLOAT32.unpack(_FLOAT32.pack(value))[0]
+
+
+def _floor_f32_mul(x: float, y: float) -> int:
+    """
+    Multiplies given values with single precision (as blender does) and
+    rounds the result down.
+    """
+    return math.floor(_to_f32(_to_f32(x) * _to_f32(y)))
+
 
 class Resolution(NamedTuple):
     width: int
@@ -20,6 +40,8 @@ class FloatingPointBox:
     numbers as a percentage of image corresponding resolution.
     It mimic blender coordinate system, when trying to render partial image.
     """
+    __slots__ = ('left', 'top', 'right', 'bottom')
+
     def __init__(
             self,
             left: float,
@@ -45,6 +67,32 @@ class FloatingPointBox:
                item.top >= self.top and item.bottom <= self.bottom
 
 
+def _float_region_to_pixel_region(
+        resolution: Resolution,
+        subtask_box: FloatingPointBox,
+        crop_box: FloatingPointBox,
+) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    """
+    Converts crop box to (min, max) pixel coordinates along x and y axes,
+    relative to the top left corner of the subtask image.
+    """
+    subtask_left = _floor_f32_mul(subtask_box.left, resolution.width)
+    x_pixel_min = _floor_f32_mul(crop_box.left, resolution.width) - \
+        subtask_left
+    x_pixel_max = _floor_f32_mul(crop_box.right, resolution.width) - \
+        subtask_left
+    logger.debug('x_pixel_min=%r, x_pixel_max=%r', x_pixel_min, x_pixel_max)
+
+    subtask_bottom = _floor_f32_mul(subtask_box.bottom, resolution.height)
+    y_pixel_min = subtask_bottom - \
+        _floor_f32_mul(crop_box.bottom, resolution.height)
+    y_pixel_max = subtask_bottom - \
+        _floor_f32_mul(crop_box.top, resolution.height)
+    logger.debug('y_pixel_min=%r, y_pixel_max=%r', y_pixel_min, y_pixel_max)
+
+    return (x_pixel_min, x_pixel_max), (y_pixel_min, y_pixel_max)
+
+
 class Crop:
     STEP_SIZE = 0.01
 
@@ -60,29 +108,27 @@ class Crop:
         self._subtask_box = subtask_box
         self.box = crop_box or self._generate_random_crop_box()
         self._validate_crop_is_within_subtask()
-
-    @property
-    def x_pixels(self):
-        return self._get_x_coordinates_as_pixels()
-
-    @property
-    def y_pixels(self):
-        return self._get_y_coordinates_as_pixels()
+        self.x_pixels, self.y_pixels = _float_region_to_pixel_region(
+            self.resolution, self._subtask_box, self.box
+        )
 
     def _generate_random_crop_box(self) -> FloatingPointBox:
         crop_width, crop_height = self._get_relative_crop_size()
 
-        print(f'-> subtask_box.left={self._subtask_box.left}')
-        print(f'-> subtask_box.right={self._subtask_box.right}')
-        print(f'-> subtask_box.top={self._subtask_box.top}')
-        print(f'-> subtask_box.bottom={self._subtask_box.bottom}')
+        logger.debug(
+            'subtask_box: left=%r, right=%r, top=%r, bottom=%r',
+            self._subtask_box.left,
+            self._subtask_box.right,
+            self._subtask_box.top,
+            self._subtask_box.bottom,
+        )
 
         x_beginning, x_end = self._get_coordinate_limits(
             lower_border=self._subtask_box.left,
             upper_border=self._subtask_box.right,
             span=crop_width
         )
-        print(f"x_beginning={x_beginning}, x_end={x_end}")
+        logger.debug('x_beginning=%r, x_end=%r', x_beginning, x_end)
 
         # left, top is (0,0) in image coordinates
         y_beginning, y_end = self._get_coordinate_limits(
@@ -90,7 +136,7 @@ class Crop:
             upper_border=self._subtask_box.bottom,
             span=crop_height
         )
-        print(f"y_beginning={y_beginning}, y_end={y_end}")
+        logger.debug('y_beginning=%r, y_end=%r', y_beginning, y_end)
 
         return FloatingPointBox(
             left=x_beginning,
@@ -101,9 +147,9 @@ class Crop:
 
     @staticmethod
     def _get_coordinate_limits(lower_border, upper_border, span):
-        beginning = numpy.float32(random.uniform(lower_border, upper_border - span))
+        beginning = _to_f32(random.uniform(lower_border, upper_border - span))
         beginning = max(beginning, lower_border)
-        end = min(numpy.float32(beginning + span), upper_border)
+        end = min(_to_f32(beginning + span), upper_border)
         return beginning, end
 
     def _get_relative_crop_size(self) -> Tuple[float, float]:
@@ -111,56 +157,54 @@ class Crop:
                                  self._subtask_box.left
         subtask_relative_height = self._subtask_box.bottom - \
                                   self._subtask_box.top
-        relative_crop_width = numpy.float32(CROP_RELATIVE_SIZE) * numpy.float32(
-            subtask_relative_width)
-        relative_crop_height = numpy.float32(
-            CROP_RELATIVE_SIZE) * numpy.float32(subtask_relative_height)
-        print(
-            f"initial relative_crop_width: {relative_crop_width}, "
-            f"initial relative_crop_height: {relative_crop_height}"
+        crop_relative_size = _to_f32(CROP_RELATIVE_SIZE)
+        relative_crop_width = _to_f32(
+            crop_relative_size * _to_f32(subtask_relative_width))
+        relative_crop_height = _to_f32(
+            crop_relative_size * _to_f32(subtask_relative_height))
+        logger.debug(
+            'initial relative_crop_width: %r, '
+            'initial relative_crop_height: %r',
+            relative_crop_width,
+            relative_crop_height,
         )
-        while numpy.float32(relative_crop_width * self.resolution.width) < MIN_CROP_SIZE:
-            relative_crop_width += numpy.float32(self.STEP_SIZE)
-        while numpy.float32(relative_crop_height * self.resolution.height) < MIN_CROP_SIZE:
-            relative_crop_height += numpy.float32(self.STEP_SIZE)
-        print(
-            f"relative_crop_width: {relative_crop_width}, "
-            f"relative_crop_height: {relative_crop_height}"
+        relative_crop_width = self._expand_to_min_crop_size(
+            relative_crop_width, self.resolution.width)
+        relative_crop_height = self._expand_to_min_crop_size(
+            relative_crop_height, self.resolution.height)
+        logger.debug(
+            'relative_crop_width: %r, relative_crop_height: %r',
+            relative_crop_width,
+            relative_crop_height,
         )
         return relative_crop_width, relative_crop_height
 
+    @classmethod
+    def _expand_to_min_crop_size(
+            cls,
+            relative_size: float,
+            resolution: int,
+    ) -> float:
+        """
+        Grows relative crop size by the smallest number of STEP_SIZE steps,
+        so it spans at least MIN_CROP_SIZE pixels in given resolution.
+        """
+        def covers_min_crop_size(steps: int) -> bool:
+            size = _to_f32(relative_size + steps * cls.STEP_SIZE)
+            return _to_f32(size * resolution) >= MIN_CROP_SIZE
+
+        if covers_min_crop_size(0):
+            return relative_size
+        steps = math.ceil(
+            (MIN_CROP_SIZE / resolution - relative_size) / cls.STEP_SIZE
+        )
+        # single precision rounding may leave the estimate one step off
+        if covers_min_crop_size(steps - 1):
+            steps -= 1
+        elif not covers_min_crop_size(steps):
+            steps += 1
+        return _to_f32(relative_size + steps * cls.STEP_SIZE)
+
     def _validate_crop_is_within_subtask(self):
         if self.box not in self._subtask_box:
             raise ValueError("Crop box is not within subtask box!")
-
-    def _get_x_coordinates_as_pixels(self) -> Tuple[int, int]:
-        x_pixel_min = self._calculate_pixel_position(
-            self.box.left, self._subtask_box.left, self.resolution.width
-        )
-        x_pixel_max = self._calculate_pixel_position(
-            self.box.right, self._subtask_box.left, self.resolution.width
-        )
-        print(f"x_pixel_min={x_pixel_min}, x_pixel_max={x_pixel_max}")
-        return x_pixel_min, x_pixel_max
-
-    def _get_y_coordinates_as_pixels(self) -> Tuple[int, int]:
-        y_pixel_min = self._calculate_pixel_position(
-            self._subtask_box.bottom, self.box.bottom, self.resolution.height
-        )
-        y_pixel_max = self._calculate_pixel_position(
-            self._subtask_box.bottom, self.box.top, self.resolution.height
-        )
-        print(f"y_pixel_min={y_pixel_min}, y_pixel_max={y_pixel_max}")
-        return y_pixel_min, y_pixel_max
-
-    @staticmethod
-    def _calculate_pixel_position(
-        minuend: float,
-        subtrahend: float,
-        resolution: int,
-    ) -> int:
-        return math.floor(
-            numpy.float32(minuend) * numpy.float32(resolution)
-        ) - math.floor(
-            numpy.float32(subtrahend) * numpy.float32(resolution)
-        )
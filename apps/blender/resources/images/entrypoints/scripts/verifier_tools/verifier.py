@@ -228,20 +228,20 @@ def verify(  # pylint: disable=too-many-arguments
     make_verdict(subtask_file_paths, crops, results)
 
 
-def convert_float32_to_double(params: dict):
+def normalize_crop_borders(params: dict):
     new_params = params.copy()
     crops_array = new_params['crops']
 
     for crop in crops_array:
-        # value.item() converts numpy type to native Python type
-        crop['borders_x'] = [value.item() for value in crop['borders_x']]
-        crop['borders_y'] = [value.item() for value in crop['borders_y']]
+        # borders supplied by callers may be of any numeric type
+        crop['borders_x'] = [float(value) for value in crop['borders_x']]
+        crop['borders_y'] = [float(value) for value in crop['borders_y']]
 
     return new_params
 
 
 def save_params(params: dict, filename: str, mounted_paths: dict):
-    new_params = convert_float32_to_double(params)
+    new_params = normalize_crop_borders(params)
 
     path = os.path.join(mounted_paths["WORK_DIR"], filename)
     with open(path, 'w', encoding='utf-8') as f:
@@ -0,0 +1,135 @@
+import unittest
+
+from apps.blender.resources.images.entrypoints.\
+    scripts.verifier_tools import crop_generator
+from apps.blender.resources.images.entrypoints.\
+    scripts.verifier_tools.crop_generator import Crop, FloatingPointBox, \
+    Resolution
+
+
+class TestFloorF32Mul(unittest.TestCase):
+    def test_problematic_value_is_rounded_with_single_precision(self):
+        # 0.53 * 400 is 212 in double precision, but blender works with
+        # single precision floats, where it ends up just below 212
+        self.assertEqual(crop_generator._floor_f32_mul(0.53, 400), 211)
+
+    def test_known_values(self):
+        self.assertEqual(crop_generator._floor_f32_mul(0.1, 1920), 192)
+        self.assertEqual(crop_generator._floor_f32_mul(0.3, 1080), 324)
+        self.assertEqual(crop_generator._floor_f32_mul(0.7, 100), 70)
+
+
+class TestCropPixels(unittest.TestCase):
+    def test_problematic_subtask_border(self):
+        crop = Crop(
+            0,
+            Resolution(400, 400),
+            FloatingPointBox(0.0, 0.0, 1.0, 0.53),
+            FloatingPointBox(0.25, 0.0, 0.5, 0.53),
+        )
+        self.assertEqual(crop.x_pixels, (100, 200))
+        self.assertEqual(crop.y_pixels, (0, 211))
+
+    def test_crop_within_400x400_subtask(self):
+        crop = Crop(
+            0,
+            Resolution(400, 400),
+            FloatingPointBox(0.0, 0.0, 1.0, 0.53),
+            FloatingPointBox(0.1, 0.2, 0.3, 0.4),
+        )
+        self.assertEqual(crop.x_pixels, (40, 120))
+        self.assertEqual(crop.y_pixels, (51, 131))
+
+    def test_pixels_are_relative_to_subtask_corner(self):
+        # x is counted from subtask left border, y from subtask bottom border
+        crop = Crop(
+            0,
+            Resolution(400, 400),
+            FloatingPointBox(0.2, 0.33, 0.9, 0.71),
+            FloatingPointBox(0.35, 0.4, 0.55, 0.61),
+        )
+        self.assertEqual(crop.x_pixels, (60, 140))
+        self.assertEqual(crop.y_pixels, (40, 124))
+
+    def test_pixels_for_non_square_resolution(self):
+        crop = Crop(
+            0,
+            Resolution(1920, 1080),
+            FloatingPointBox(0.0, 0.5, 1.0, 1.0),
+            FloatingPointBox(0.1, 0.6, 0.3, 0.9),
+        )
+        self.assertEqual(crop.x_pixels, (192, 576))
+        self.assertEqual(crop.y_pixels, (108, 432))
+
+
+class TestExpandToMinCropSize(unittest.TestCase):
+    @staticmethod
+    def _initial_relative_size(subtask_size: float) -> float:
+        return crop_generator._to_f32(
+            crop_generator._to_f32(crop_generator.CROP_RELATIVE_SIZE) *
+            crop_generator._to_f32(subtask_size)
+        )
+
+    @staticmethod
+    def _covers_min_crop_size(relative_size: float, resolution: int) -> bool:
+        return crop_generator._to_f32(relative_size * resolution) >= \
+            crop_generator.MIN_CROP_SIZE
+
+    @staticmethod
+    def _expand_with_steps(relative_size: float, resolution: int) -> float:
+        # the original stepping loop, without accumulating rounding errors
+        steps = 0
+        while True:
+            size = crop_generator._to_f32(
+                relative_size + steps * Crop.STEP_SIZE)
+            if crop_generator._to_f32(size * resolution) >= \
+                    crop_generator.MIN_CROP_SIZE:
+                return size
+            steps += 1
+
+    @staticmethod
+    def _expand_with_accumulated_steps(
+            relative_size: float,
+            resolution: int,
+    ) -> float:
+        # the original stepping loop, as it was written
+        step_size = crop_generator._to_f32(Crop.STEP_SIZE)
+        while crop_generator._to_f32(relative_size * resolution) < \
+                crop_generator.MIN_CROP_SIZE:
+            relative_size = crop_generator._to_f32(relative_size + step_size)
+        return relative_size
+
+    def test_matches_stepping_loop(self):
+        for resolution in range(1, 601):
+            for subtask_size in range(1, 101, 3):
+                relative_size = self._initial_relative_size(subtask_size / 100)
+                with self.subTest(
+                        resolution=resolution, subtask_size=subtask_size):
+                    expanded = Crop._expand_to_min_crop_size(
+                        relative_size, resolution)
+                    self.assertEqual(
+                        expanded,
+                        self._expand_with_steps(relative_size, resolution)
+                    )
+                    self.assertTrue(
+                        self._covers_min_crop_size(expanded, resolution))
+                    # never takes more steps than the accumulating loop
+                    self.assertLess(
+                        expanded,
+                        self._expand_with_accumulated_steps(
+                            relative_size, resolution) + Crop.STEP_SIZE / 2
+                    )
+
+    def test_does_not_overshoot_by_a_step(self):
+        relative_size = self._initial_relative_size(0.9)
+        self.assertAlmostEqual(
+            Crop._expand_to_min_crop_size(relative_size, 50), 0.16, places=6)
+        self.assertAlmostEqual(
+            Crop._expand_to_min_crop_size(relative_size, 1), 8.0, places=5)
+
+    def test_large_enough_size_is_not_changed(self):
+        relative_size = self._initial_relative_size(1.0)
+        self.assertEqual(
+            Crop._expand_to_min_crop_size(relative_size, 1920),
+            relative_size
+        )